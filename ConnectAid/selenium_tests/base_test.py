@@ -72,6 +72,15 @@ class BaseTest:
         # Navigate to base URL
         self.driver.get(TestConfig.BASE_URL)
         
+    def reset_browser_state(self):
+        """Return the warm browser to a clean state before a test is retried"""
+        try:
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            self.driver.delete_all_cookies()
+        except Exception as e:
+            print(f"Browser state reset failed: {e}")
+        self.driver.get(TestConfig.BASE_URL)
+        
     def teardown_driver(self):
         """Close the browser"""
         if hasattr(self, 'driver'):
@@ -0,0 +1,170 @@
+"""
+Flake-aware pytest hooks for the ConnectAid Selenium tests
+- Failed tests are retried immediately in the same (warm) browser
+- Per-test pass/fail/retry history is persisted across runs
+- Tests whose flake rate crosses the threshold are quarantined into a
+  non-blocking lane
+"""
+
+import pytest
+from flake_stats import FlakeStats, save_quarantine, load_quarantine
+from config import TestConfig
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('flaky', 'flaky test handling')
+    group.addoption(
+        '--retries',
+        type=int,
+        default=TestConfig.FLAKE_RETRIES,
+        help=f'Immediate retries for a failing test (default: {TestConfig.FLAKE_RETRIES})'
+    )
+    group.addoption(
+        '--flake-threshold',
+        type=float,
+        default=TestConfig.FLAKE_THRESHOLD,
+        help=f'Flake rate at which a test is quarantined (default: {TestConfig.FLAKE_THRESHOLD})'
+    )
+    group.addoption(
+        '--flake-stats',
+        default=TestConfig.FLAKE_STATS_FILE,
+        help=f'Flakiness history file (default: {TestConfig.FLAKE_STATS_FILE})'
+    )
+    group.addoption(
+        '--quarantine',
+        choices=['xfail', 'skip', 'only'],
+        default='xfail',
+        help='Quarantined tests: run non-blocking (xfail), leave out (skip) or run only them (only)'
+    )
+    group.addoption(
+        '--quarantine-file',
+        default=TestConfig.FLAKE_QUARANTINE_FILE,
+        help='Quarantine decision written by the blocking run and reused by --quarantine=only '
+             f'(default: {TestConfig.FLAKE_QUARANTINE_FILE})'
+    )
+
+
+def pytest_configure(config):
+    config.flake_stats = FlakeStats(config.getoption('--flake-stats'))
+    config.flake_results = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    stats = config.flake_stats
+    threshold = config.getoption('--flake-threshold')
+    mode = config.getoption('--quarantine')
+
+    # The quarantine lane runs exactly what the blocking lane left out, so a
+    # test that crosses the threshold during the blocking run is not run and
+    # recorded twice in the same build
+    decided = None
+    if mode == 'only':
+        decided = load_quarantine(config.getoption('--quarantine-file'))
+
+    selected, deselected, quarantined_ids = [], [], []
+    for item in items:
+        if decided is not None:
+            quarantined = item.nodeid in decided
+        else:
+            quarantined = stats.is_quarantined(item.nodeid, threshold, TestConfig.FLAKE_MIN_RUNS)
+        if quarantined:
+            quarantined_ids.append(item.nodeid)
+        # The quarantine lane (--quarantine=only) is non-blocking on its own,
+        # so its failures are reported as real failures there
+        if quarantined and mode != 'only':
+            rate = stats.flake_rate(item.nodeid)
+            item.add_marker(pytest.mark.xfail(
+                reason=f'quarantined: flake rate {rate:.0%}', strict=False
+            ))
+        if (mode == 'skip' and quarantined) or (mode == 'only' and not quarantined):
+            deselected.append(item)
+        else:
+            selected.append(item)
+
+    if mode != 'only':
+        save_quarantine(config.getoption('--quarantine-file'), quarantined_ids)
+
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run the test function, retrying failures while the browser is still warm"""
+    retries = pyfuncitem.config.getoption('--retries')
+    funcargs = pyfuncitem.funcargs
+    testargs = {arg: funcargs[arg] for arg in pyfuncitem._fixtureinfo.argnames}
+
+    pyfuncitem.flake_retries = 0
+    while True:
+        try:
+            pyfuncitem.obj(**testargs)
+            return True
+        except Exception as e:
+            if pyfuncitem.flake_retries >= retries:
+                raise
+            pyfuncitem.flake_retries += 1
+            print(f"\n🔁 Retry {pyfuncitem.flake_retries}/{retries} after: {type(e).__name__}: {e}")
+            instance = getattr(pyfuncitem, 'instance', None)
+            if hasattr(instance, 'reset_browser_state'):
+                instance.reset_browser_state()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if call.when != 'call':
+        return
+
+    # A skip says nothing about flakiness, so it is not recorded
+    if call.excinfo is not None and call.excinfo.errisinstance(pytest.skip.Exception):
+        return
+
+    retries = getattr(item, 'flake_retries', 0)
+    item.config.flake_results[item.nodeid] = {'passed': call.excinfo is None, 'retries': retries}
+    if retries:
+        report = outcome.get_result()
+        report.user_properties.append(('flake_retries', retries))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Collect results from pytest-xdist workers on the controller"""
+    results = getattr(node, 'workeroutput', {}).get('flake_results', {})
+    node.config.flake_results.update(results)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if hasattr(config, 'workerinput'):
+        # xdist worker: hand results to the controller, which owns the stats file
+        config.workeroutput['flake_results'] = config.flake_results
+        return
+
+    stats = config.flake_stats
+    for nodeid, result in config.flake_results.items():
+        stats.record(nodeid, result['passed'], result['retries'])
+    stats.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.flake_results
+    retried = {nodeid: r for nodeid, r in results.items() if r['retries']}
+    threshold = config.getoption('--flake-threshold')
+    quarantined = [
+        nodeid for nodeid in results
+        if config.flake_stats.is_quarantined(nodeid, threshold, TestConfig.FLAKE_MIN_RUNS)
+    ]
+
+    if not retried and not quarantined:
+        return
+
+    terminalreporter.section('flaky tests')
+    for nodeid, result in retried.items():
+        status = 'passed' if result['passed'] else 'failed'
+        terminalreporter.write_line(f"🔁 {nodeid}: {status} after {result['retries']} retries")
+    for nodeid in quarantined:
+        rate = config.flake_stats.flake_rate(nodeid)
+        terminalreporter.write_line(f"🚧 {nodeid}: quarantined (flake rate {rate:.0%})")
+    terminalreporter.write_line(f"History: {config.getoption('--flake-stats')}")
@@ -0,0 +1,87 @@
+"""
+Persistent per-test flakiness statistics for the ConnectAid Selenium tests
+Results of every run are kept in a local JSON file so that flaky tests can be
+spotted across runs and quarantined into a non-blocking lane
+"""
+
+import json
+import os
+from pathlib import Path
+
+
+class FlakeStats:
+    """Per-test pass/fail/retry history stored in a JSON file"""
+
+    def __init__(self, path, window=20):
+        self.path = Path(path)
+        self.window = window
+        self.tests = {}
+        self.load()
+
+    def load(self):
+        """Load the history file, starting fresh if it is missing or unreadable"""
+        try:
+            with open(self.path) as f:
+                self.tests = json.load(f).get('tests', {})
+        except (OSError, ValueError):
+            self.tests = {}
+
+    def save(self):
+        """Write the history file atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'tests': self.tests}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def record(self, nodeid, passed, retries):
+        """Record the final outcome of one test and how many retries it needed"""
+        entry = self.tests.setdefault(nodeid, {
+            'runs': 0, 'passes': 0, 'failures': 0, 'retries': 0, 'history': []
+        })
+        entry['runs'] += 1
+        entry['passes' if passed else 'failures'] += 1
+        entry['retries'] += retries
+        entry['history'].append({'passed': passed, 'retries': retries})
+        entry['history'] = entry['history'][-self.window:]
+
+    def flake_rate(self, nodeid):
+        """Share of recent runs that were flaky
+
+        A run is flaky when it passed only after a retry, or when it failed
+        on its own between two passing runs. Consecutive hard failures count
+        as a regression, not flakiness, so they keep failing the blocking lane.
+        """
+        history = self.tests.get(nodeid, {}).get('history', [])
+        if not history:
+            return 0.0
+        flaky_runs = 0
+        for i, run in enumerate(history):
+            if run['passed']:
+                flaky_runs += bool(run['retries'])
+            elif 0 < i < len(history) - 1 and history[i - 1]['passed'] and history[i + 1]['passed']:
+                flaky_runs += 1
+        return flaky_runs / len(history)
+
+    def is_quarantined(self, nodeid, threshold, min_runs):
+        history = self.tests.get(nodeid, {}).get('history', [])
+        return len(history) >= min_runs and self.flake_rate(nodeid) >= threshold
+
+
+def save_quarantine(path, nodeids):
+    """Write the quarantine decision made by the blocking lane"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(sorted(nodeids), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_quarantine(path):
+    """Read the quarantine decision, or None when no blocking lane has written one"""
+    try:
+        with open(path) as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        return None
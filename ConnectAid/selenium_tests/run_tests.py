@@ -23,7 +23,8 @@ def setup_environment():
     
     print("Test environment setup complete")
 
-def run_tests(test_suite=None, verbose=True, html_report=True):
+def run_tests(test_suite=None, verbose=True, html_report=True, retries=None, quarantine='skip',
+              report_path='reports/test_report.html'):
     """Run the test suite"""
     cmd = ['python', '-m', 'pytest']
     
@@ -34,7 +35,12 @@ def run_tests(test_suite=None, verbose=True, html_report=True):
         cmd.append('-v')
     
     if html_report:
-        cmd.extend(['--html=reports/test_report.html', '--self-contained-html'])
+        cmd.extend([f'--html={report_path}', '--self-contained-html'])
+    
+    # Flaky test handling (see conftest.py)
+    if retries is not None:
+        cmd.append(f'--retries={retries}')
+    cmd.append(f'--quarantine={quarantine}')
     
     # Add other useful options
     cmd.extend([
@@ -70,6 +76,17 @@ def main():
         action='store_true',
         help='Skip HTML report generation'
     )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=None,
+        help='Immediate retries for a failing test (default: FLAKE_RETRIES from config)'
+    )
+    parser.add_argument(
+        '--no-quarantine-lane',
+        action='store_true',
+        help='Skip the non-blocking run of quarantined flaky tests'
+    )
     parser.add_argument(
         '--parallel', 
         action='store_true',
@@ -103,9 +120,25 @@ def main():
     exit_code = run_tests(
         test_suite=test_file,
         verbose=True,
-        html_report=not args.no_html
+        html_report=not args.no_html,
+        retries=args.retries
     )
     
+    # Quarantined flaky tests run in their own lane and never fail the build.
+    # pytest exits with 5 when no tests are quarantined.
+    if not args.no_quarantine_lane:
+        print("\nRunning quarantined flaky tests (non-blocking)...")
+        quarantine_code = run_tests(
+            test_suite=test_file,
+            verbose=True,
+            html_report=not args.no_html,
+            retries=args.retries,
+            quarantine='only',
+            report_path='reports/quarantine_report.html'
+        )
+        if quarantine_code not in (0, 5):
+            print(f"⚠️ Quarantined tests failed with exit code: {quarantine_code} (non-blocking)")
+    
     if exit_code == 0:
         print("\n✅ All tests passed!")
         if not args.no_html:
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Data-volume scaling benchmark for ConnectAid
+Grows the number of appeals and donations through the API in steps
+(10^2 .. 10^5 by default) and at each step measures API latency and
+response size of the appeal list, contributions and appeal detail
+endpoints plus the browser render time of the list/dashboard pages,
+against the number of records each one actually returns.
+Writes a scaling-curve CSV and chart to reports/ and cancels the seeded
+appeals afterwards
+
+The chart needs matplotlib: pip install -r requirements-benchmark.txt
+"""
+
+import sys
+import csv
+import math
+import time
+import uuid
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from base_test import BaseTest
+from config import TestConfig
+from stress_donations import API_URL, get_session, auth_headers, percentile, seed_users
+
+# Endpoints measured at every size; {appeal} is the detail appeal collecting
+# one donor's donations
+ENDPOINTS = {
+    'GET /donation-appeals/all': ('/donation-appeals/all', False),
+    'GET /my-contributions': ('/my-contributions', True),
+    'GET /donation-appeals/:id': ('/donation-appeals/{appeal}', False),
+}
+
+# Pages measured at every size, with the API call that feeds each one
+PAGES = {
+    'DonationCallList': ('/main', '/donation-appeals/all'),
+    'DonationAppealsDashboard': ('/main/my-appeals', '/my-appeals'),
+    'UserContributions': ('/main/my-contributions', '/my-contributions'),
+}
+
+# Rendered once the page is no longer loading and its card grid is in the DOM
+RENDERED_SCRIPT = (
+    "return !document.body.innerText.includes('Loading...')"
+    " && document.querySelector('div.grid') !== null;"
+)
+
+
+def create_appeal(token, title):
+    response = get_session().post(f"{API_URL}/donation-appeals", data={
+        'title': title,
+        'description': 'Appeal created by the scaling benchmark',
+        'category': TestConfig.TEST_DONATION_APPEAL['category'],
+        'goal': TestConfig.SCALING_APPEAL_GOAL
+    }, headers=auth_headers(token), timeout=TestConfig.SCALING_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()['appeal']['_id']
+
+
+def create_donation(token, appeal_id):
+    get_session().post(f"{API_URL}/donate", json={
+        'appealId': appeal_id,
+        'amount': 1,
+        'message': 'scaling'
+    }, headers=auth_headers(token), timeout=TestConfig.SCALING_REQUEST_TIMEOUT).raise_for_status()
+
+
+def cancel_appeals(token, appeal_ids, workers):
+    """Cancel seeded appeals so they drop out of the shared appeal list"""
+    if not appeal_ids:
+        return
+    print(f"🧹 Cancelling {len(appeal_ids)} seeded appeals...")
+
+    def cancel(appeal_id):
+        try:
+            response = get_session().delete(f"{API_URL}/cancel-appeal/{appeal_id}", headers=auth_headers(token),
+                                            timeout=TestConfig.SCALING_REQUEST_TIMEOUT)
+            return response.ok
+        except requests.RequestException:
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        failed = sum(1 for ok in executor.map(cancel, appeal_ids) if not ok)
+    if failed:
+        print(f"⚠️ {failed} appeals could not be cancelled")
+
+
+def record_count(body):
+    """Number of records behind a response: list length, or an appeal's donations"""
+    if isinstance(body, list):
+        return len(body)
+    return len(body.get('donations', []))
+
+
+def grow_dataset(owner, detail_donor, detail_id, appeals, counts, target, run_id, workers, seeded):
+    """Grow appeals, contributions and detail donations until each reaches `target`
+
+    `owner` creates every small appeal and gives one donation to each, so
+    its contributions populate many small appeals. `detail_donor` gives all
+    of its donations to the detail appeal, whose populated donation list
+    grows on its own. Putting both on one appeal would make every
+    contribution carry an N-donation appeal, an N*N response.
+    """
+    new_appeals = range(len(appeals), target)
+    new_contributions = range(counts['contributions'], target)
+    new_detail = range(counts['detail'], target)
+    if not new_appeals and not new_contributions and not new_detail:
+        return
+    print(f"🌱 Seeding {len(new_appeals)} appeals, {len(new_contributions)} contributions and "
+          f"{len(new_detail)} detail donations up to {target}...")
+
+    def create_tracked(i):
+        appeal_id = create_appeal(owner['token'], f'Scaling appeal {run_id} #{i}')
+        seeded.append(appeal_id)
+        return appeal_id
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        appeals.extend(executor.map(create_tracked, new_appeals))
+        list(executor.map(lambda i: create_donation(owner['token'], appeals[i]), new_contributions))
+        counts['contributions'] = target
+        list(executor.map(lambda _: create_donation(detail_donor['token'], detail_id), new_detail))
+        counts['detail'] = target
+    print(f"   done in {time.perf_counter() - start:.1f}s")
+
+
+def result_row(step, kind, target, size='', p50_ms='', p95_ms='', size_bytes='', error=''):
+    return {
+        'step': step,
+        'size': size,
+        'kind': kind,
+        'target': target,
+        'p50_ms': p50_ms,
+        'p95_ms': p95_ms,
+        'bytes': size_bytes,
+        'error': error
+    }
+
+
+def failed_row(step, kind, target, e):
+    error = f"{type(e).__name__}: {e}"[:200]
+    print(f"   ❌ {target} failed: {error}")
+    return result_row(step, kind, target, error=error)
+
+
+def measure_endpoints(step, user, appeal_id, repeats):
+    """Measure each endpoint; a failing endpoint gets an error row and the rest still run"""
+    session = get_session()
+    rows = []
+    for name, (path, needs_auth) in ENDPOINTS.items():
+        headers = auth_headers(user['token']) if needs_auth else {}
+        url = f"{API_URL}{path.format(appeal=appeal_id)}"
+        latencies_ms = []
+        try:
+            for _ in range(repeats):
+                start = time.perf_counter()
+                response = session.get(url, headers=headers, timeout=TestConfig.SCALING_REQUEST_TIMEOUT)
+                latencies_ms.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+            size = record_count(response.json())
+        except (requests.RequestException, ValueError) as e:
+            rows.append(failed_row(step, 'api', name, e))
+            continue
+        rows.append(result_row(
+            step, 'api', name, size,
+            round(percentile(latencies_ms, 50), 1),
+            round(percentile(latencies_ms, 95), 1),
+            len(response.content)
+        ))
+    return rows
+
+
+def measure_pages(step, browser, user, repeats):
+    """Measure each page's render time; a failing page gets an error row and the rest still run"""
+    driver = browser.driver
+    try:
+        driver.get(TestConfig.BASE_URL)
+        driver.execute_script("window.localStorage.setItem('authToken', arguments[0]);", user['token'])
+    except WebDriverException as e:
+        return [failed_row(step, 'page', name, e) for name in PAGES]
+
+    rows = []
+    for name, (path, api_path) in PAGES.items():
+        render_ms = []
+        try:
+            response = get_session().get(f"{API_URL}{api_path}", headers=auth_headers(user['token']),
+                                         timeout=TestConfig.SCALING_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            size = record_count(response.json())
+            for _ in range(repeats):
+                start = time.perf_counter()
+                driver.get(f"{TestConfig.BASE_URL}{path}")
+                # Poll often so render times are not rounded to the default 0.5 s poll
+                WebDriverWait(driver, TestConfig.SCALING_RENDER_TIMEOUT, poll_frequency=0.02).until(
+                    lambda d: d.execute_script(RENDERED_SCRIPT)
+                )
+                render_ms.append((time.perf_counter() - start) * 1000)
+        except (requests.RequestException, ValueError, WebDriverException) as e:
+            rows.append(failed_row(step, 'page', name, e))
+            continue
+        rows.append(result_row(
+            step, 'page', name, size,
+            round(percentile(render_ms, 50), 1),
+            round(percentile(render_ms, 95), 1),
+            len(driver.page_source.encode())
+        ))
+    return rows
+
+
+def add_scaling_exponents(rows):
+    """Annotate each row with the log-log slope of p50 latency since the previous size
+
+    `size` is the number of records the target actually returned, which
+    includes appeals that were already in the database. A slope around 1
+    means linear growth; above SCALING_LINEAR_EXPONENT the target has
+    stopped scaling linearly.
+    """
+    previous = {}
+    for row in rows:
+        prev = previous.get(row['target'])
+        row['exponent'] = ''
+        row['superlinear'] = False
+        if row['error']:
+            continue
+        if prev and row['size'] > prev['size'] and prev['p50_ms'] > 0 and row['p50_ms'] > 0:
+            exponent = math.log(row['p50_ms'] / prev['p50_ms']) / math.log(row['size'] / prev['size'])
+            row['exponent'] = round(exponent, 2)
+            row['superlinear'] = exponent > TestConfig.SCALING_LINEAR_EXPONENT
+        previous[row['target']] = row
+
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_chart(rows, path):
+    """Plot latency and response size against dataset size on log-log axes"""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib not installed, skipping chart (pip install -r requirements-benchmark.txt)")
+        return False
+
+    measured = [row for row in rows if not row['error'] and row['size'] > 0 and row['p50_ms'] > 0]
+    if not measured:
+        print("⚠️ No successful measurements, skipping chart")
+        return False
+
+    fig, (latency_ax, bytes_ax) = plt.subplots(1, 2, figsize=(14, 6))
+    for target in dict.fromkeys(row['target'] for row in measured):
+        series = [row for row in measured if row['target'] == target]
+        sizes = [row['size'] for row in series]
+        line, = latency_ax.plot(sizes, [row['p50_ms'] for row in series], marker='o', label=target)
+        bytes_ax.plot(sizes, [row['bytes'] for row in series], marker='o', label=target)
+
+        # Dashed linear reference from this target's own first point
+        first = series[0]
+        latency_ax.plot(sizes, [first['p50_ms'] * size / first['size'] for size in sizes],
+                        '--', color=line.get_color(), alpha=0.4)
+
+    latency_ax.set_title('dashed: linear growth from each first point', fontsize='small')
+    for ax, ylabel in ((latency_ax, 'p50 latency / render time (ms)'), (bytes_ax, 'response size (bytes)')):
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('records returned')
+        ax.set_ylabel(ylabel)
+        ax.grid(True, which='both', alpha=0.3)
+        ax.legend(fontsize='small')
+
+    fig.suptitle('ConnectAid data-volume scaling')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return True
+
+
+def print_summary(rows):
+    print("\n📊 Scaling curve")
+    print(f"{'step':>8} {'records':>8} {'target':<28} {'p50 ms':>10} {'p95 ms':>10} {'bytes':>12} {'slope':>6}")
+    for row in rows:
+        if row['error']:
+            print(f"{row['step']:>8} {'-':>8} {row['target']:<28} ❌ {row['error']}")
+            continue
+        flag = '  ⚠️ superlinear' if row['superlinear'] else ''
+        print(f"{row['step']:>8} {row['size']:>8} {row['target']:<28} {row['p50_ms']:>10} {row['p95_ms']:>10} "
+              f"{row['bytes']:>12} {row['exponent']!s:>6}{flag}")
+
+    breakpoints = {}
+    for row in rows:
+        if row['superlinear'] and row['target'] not in breakpoints:
+            breakpoints[row['target']] = row['size']
+    if breakpoints:
+        print("\n❌ Stopped scaling linearly:")
+        for target, size in breakpoints.items():
+            print(f"   {target} at {size} records")
+    else:
+        print("\n✅ Every endpoint and page scaled linearly or better")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ConnectAid endpoints and pages against data volume')
+    parser.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')],
+                        default=TestConfig.SCALING_SIZES,
+                        help='Comma separated dataset sizes (default: %(default)s)')
+    parser.add_argument('--repeats', type=int, default=TestConfig.SCALING_REPEATS,
+                        help=f'Measurements per target and size (default: {TestConfig.SCALING_REPEATS})')
+    parser.add_argument('--workers', type=int, default=TestConfig.SCALING_SEED_WORKERS,
+                        help=f'Concurrent seeding requests (default: {TestConfig.SCALING_SEED_WORKERS})')
+    parser.add_argument('--skip-browser', action='store_true',
+                        help='Only measure the API, not page render times')
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    print(f"🚀 Scaling benchmark {run_id} against {API_URL}")
+
+    # The owner's appeals and contributions grow the list, dashboard and
+    # contributions; the detail donor grows the detail appeal (see grow_dataset)
+    user, detail_donor = seed_users(2, run_id)
+    appeal_id = create_appeal(user['token'], f'Scaling detail appeal {run_id}')
+    seeded = [appeal_id]
+    appeals = []
+    counts = {'contributions': 0, 'detail': 0}
+
+    Path('reports').mkdir(exist_ok=True)
+    csv_path = Path('reports') / 'scaling_benchmark.csv'
+    chart_path = Path('reports') / 'scaling_benchmark.png'
+
+    browser = None
+    rows = []
+    completed = True
+    try:
+        if not args.skip_browser:
+            browser = BaseTest()
+            browser.setup_driver()
+
+        for step in sorted(set(args.sizes)):
+            try:
+                grow_dataset(user, detail_donor, appeal_id, appeals, counts, step, run_id, args.workers, seeded)
+            except requests.RequestException as e:
+                print(f"❌ Seeding step {step} failed, reporting completed steps only: {type(e).__name__}: {e}")
+                completed = False
+                break
+
+            print(f"⏱️  Measuring at {step}...")
+            step_rows = measure_endpoints(step, user, appeal_id, args.repeats)
+            if browser:
+                step_rows.extend(measure_pages(step, browser, user, args.repeats))
+
+            # Keep the CSV current so completed steps survive a later failure
+            rows.extend(step_rows)
+            add_scaling_exponents(rows)
+            write_csv(rows, csv_path)
+    finally:
+        if browser:
+            browser.teardown_driver()
+        cancel_appeals(user['token'], seeded, args.workers)
+
+    if not rows:
+        print("❌ No step completed, nothing to report")
+        return 1
+
+    print_summary(rows)
+    print(f"\n📁 CSV written: {csv_path}")
+    if write_chart(rows, chart_path):
+        print(f"📈 Chart written: {chart_path}")
+    return 0 if completed and not any(row['error'] for row in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+High-contention donation and wallet stress test for ConnectAid
+Seeds many users and a few hot appeals, fires concurrent donations at
+increasing concurrency levels and audits the totals after each level:
+appeal raised amount vs Donation records vs wallet debits
+"""
+
+import sys
+import csv
+import math
+import json
+import time
+import uuid
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from config import TestConfig
+
+API_URL = f"{TestConfig.API_BASE_URL}/api/users"
+
+_thread_local = threading.local()
+
+
+def get_session():
+    """Return a requests session owned by the current worker thread"""
+    if not hasattr(_thread_local, 'session'):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+def auth_headers(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class DonationLedger:
+    """Client-side record of every donation and wallet debit the server accepted
+
+    Requests that failed on the client (e.g. timed out) may or may not have
+    been committed by the server, so they are kept apart as unknown outcomes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.appeal_credits = defaultdict(float)
+        self.user_donations = defaultdict(float)
+        self.user_debits = defaultdict(float)
+        self.unknown_credits = defaultdict(float)
+        self.unknown_donations = defaultdict(float)
+        self.unknown_debits = defaultdict(float)
+
+    def record_donation(self, appeal_id, user_id, amount):
+        with self.lock:
+            self.appeal_credits[appeal_id] += amount
+            self.user_donations[user_id] += amount
+
+    def record_debit(self, user_id, amount):
+        with self.lock:
+            self.user_debits[user_id] += amount
+
+    def record_unknown(self, kind, appeal_id, user_id, amount):
+        """Record a donation or debit whose server-side outcome is unknown"""
+        with self.lock:
+            if kind == 'donate':
+                self.unknown_credits[appeal_id] += amount
+                self.unknown_donations[user_id] += amount
+            else:
+                self.unknown_debits[user_id] += amount
+
+    def snapshot(self):
+        with self.lock:
+            return {name: defaultdict(float, getattr(self, name)) for name in (
+                'appeal_credits', 'user_donations', 'user_debits',
+                'unknown_credits', 'unknown_donations', 'unknown_debits'
+            )}
+
+
+def seed_users(count, run_id):
+    """Sign up, log in and fund the wallet of `count` stress users"""
+    session = get_session()
+    users = []
+    for i in range(count):
+        email = f"stress_{run_id}_{i}@connectaid.com"
+        password = TestConfig.TEST_USER['password']
+        signup = session.post(f"{API_URL}/signup", json={
+            'firstName': 'Stress',
+            'lastName': f'User{i}',
+            'email': email,
+            'password': password,
+            'dateOfBirth': '1990-01-01'
+        }, timeout=TestConfig.STRESS_REQUEST_TIMEOUT)
+        if signup.status_code != 201:
+            raise RuntimeError(f"Signup failed for {email}: {signup.status_code} {signup.text}")
+
+        login = session.post(f"{API_URL}/login", json={
+            'email': email,
+            'password': password
+        }, timeout=TestConfig.STRESS_REQUEST_TIMEOUT)
+        login.raise_for_status()
+        body = login.json()
+        token = body['token']
+
+        # GET creates the wallet if missing, then fund it
+        session.get(f"{API_URL}/wallet", headers=auth_headers(token),
+                    timeout=TestConfig.STRESS_REQUEST_TIMEOUT).raise_for_status()
+        session.post(f"{API_URL}/wallet/add", json={'amount': TestConfig.STRESS_WALLET_FUNDING},
+                     headers=auth_headers(token),
+                     timeout=TestConfig.STRESS_REQUEST_TIMEOUT).raise_for_status()
+
+        users.append({'id': body['user']['_id'], 'email': email, 'token': token})
+    print(f"✅ Seeded {len(users)} users with {TestConfig.STRESS_WALLET_FUNDING} each")
+    return users
+
+
+def seed_appeals(count, creator, run_id):
+    """Create `count` hot appeals owned by `creator`"""
+    session = get_session()
+    appeals = []
+    for i in range(count):
+        response = session.post(f"{API_URL}/donation-appeals", data={
+            'title': f'Stress appeal {run_id} #{i}',
+            'description': 'Hot appeal created by the donation stress test',
+            'category': TestConfig.TEST_DONATION_APPEAL['category'],
+            'goal': TestConfig.STRESS_APPEAL_GOAL
+        }, headers=auth_headers(creator['token']), timeout=TestConfig.STRESS_REQUEST_TIMEOUT)
+        response.raise_for_status()
+        appeals.append(response.json()['appeal']['_id'])
+    print(f"✅ Seeded {len(appeals)} hot appeals with goal {TestConfig.STRESS_APPEAL_GOAL}")
+    return appeals
+
+
+def send_donation(user, appeal_id, amount, ledger):
+    """POST /donate and record the outcome; returns an error label or None"""
+    try:
+        response = get_session().post(f"{API_URL}/donate", json={
+            'appealId': appeal_id,
+            'amount': amount,
+            'message': 'stress'
+        }, headers=auth_headers(user['token']), timeout=TestConfig.STRESS_REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        ledger.record_unknown('donate', appeal_id, user['id'], amount)
+        return f"donate {type(e).__name__}"
+    if response.status_code != 201:
+        return f"donate {response.status_code}"
+    ledger.record_donation(appeal_id, user['id'], amount)
+    return None
+
+
+def send_debit(user, appeal_id, amount, ledger):
+    """PUT /wallet/update and record the outcome; returns an error label or None"""
+    try:
+        response = get_session().put(f"{API_URL}/wallet/update", json={
+            'amount': amount,
+            'type': 'deduct'
+        }, headers=auth_headers(user['token']), timeout=TestConfig.STRESS_REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        ledger.record_unknown('debit', appeal_id, user['id'], amount)
+        return f"wallet {type(e).__name__}"
+    if response.status_code != 200:
+        return f"wallet {response.status_code}"
+    ledger.record_debit(user['id'], amount)
+    return None
+
+
+def donate_once(user, appeal_id, amount, ledger, debit_pool):
+    """Donate and debit the wallet concurrently, like the Promise.all in SingleDonation.jsx"""
+    start = time.perf_counter()
+    debit = debit_pool.submit(send_debit, user, appeal_id, amount, ledger)
+    donate_error = send_donation(user, appeal_id, amount, ledger)
+    debit_error = debit.result()
+    return {
+        'donate_ok': donate_error is None,
+        'debit_ok': debit_error is None,
+        'error': donate_error or debit_error,
+        'latency': time.perf_counter() - start
+    }
+
+
+def run_level(concurrency, total, users, appeals, ledger, in_flight_per_user):
+    """Fire `total` donations with `concurrency` workers and summarise the run
+
+    Jobs come in runs of `in_flight_per_user` for the same donor, so each
+    window of in-flight donations has several requests updating one wallet.
+    """
+    amount = TestConfig.STRESS_DONATION_AMOUNT
+    jobs = [
+        (users[(i // in_flight_per_user) % len(users)], appeals[i % len(appeals)])
+        for i in range(total)
+    ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as debit_pool, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda job: donate_once(job[0], job[1], amount, ledger, debit_pool), jobs
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = [r['latency'] * 1000 for r in results]
+    errors = defaultdict(int)
+    for r in results:
+        if r['error']:
+            errors[r['error']] += 1
+
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'donations_ok': sum(1 for r in results if r['donate_ok']),
+        'debits_ok': sum(1 for r in results if r['debit_ok']),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 1),
+        'p95_ms': round(percentile(latencies_ms, 95), 1),
+        'p99_ms': round(percentile(latencies_ms, 99), 1),
+        'max_ms': round(max(latencies_ms), 1) if latencies_ms else 0.0,
+        'errors': dict(errors),
+        'inconsistent': 0,
+        'ambiguous': 0
+    }
+
+
+def snapshot_server(users, appeals):
+    """Read appeal totals, Donation records and wallet balances from the API
+
+    Donation records are taken from each donor's contributions rather than
+    the appeal's own donation list, so a Donation saved without its appeal
+    update still shows up.
+    """
+    session = get_session()
+
+    def fetch(path, headers=None):
+        response = session.get(f"{API_URL}{path}", headers=headers,
+                               timeout=TestConfig.STRESS_REQUEST_TIMEOUT)
+        if not response.ok:
+            raise RuntimeError(f"Audit read GET {path} failed: {response.status_code} {response.text[:200]}")
+        return response.json()
+
+    state = {
+        'raised': {},
+        'goals': {},
+        'appeal_records': defaultdict(float),
+        'user_records': defaultdict(float),
+        'balances': {}
+    }
+
+    for appeal_id in appeals:
+        appeal = fetch(f"/donation-appeals/{appeal_id}")
+        state['raised'][appeal_id] = appeal['raised']
+        state['goals'][appeal_id] = appeal['goal']
+
+    for user in users:
+        headers = auth_headers(user['token'])
+        state['balances'][user['id']] = fetch('/wallet', headers)['balance']
+
+        for contribution in fetch('/my-contributions', headers):
+            appeal = contribution.get('donationAppeal') or {}
+            state['appeal_records'][appeal.get('_id')] += contribution['amount']
+            state['user_records'][user['id']] += contribution['amount']
+
+    return state
+
+
+def within(actual, expected, unknown):
+    """True when `actual` matches `expected` plus some share of the unknown outcomes"""
+    return expected <= actual <= expected + unknown
+
+
+def audit(users, appeals, before, after, ledger_before, ledger_after):
+    """Compare the server-side changes during one level with what the client saw accepted
+
+    Rows that only disagree by requests with an unknown outcome are counted
+    as consistent and flagged as ambiguous instead. An appeal that raised
+    more than its goal (the check-then-$inc race in makeDonation) is
+    always inconsistent.
+    """
+    def delta(name, key):
+        return ledger_after[name][key] - ledger_before[name][key]
+
+    findings = {'appeals': [], 'wallets': [], 'contributions': []}
+
+    for appeal_id in appeals:
+        raised = after['raised'][appeal_id] - before['raised'][appeal_id]
+        records = after['appeal_records'][appeal_id] - before['appeal_records'][appeal_id]
+        accepted = delta('appeal_credits', appeal_id)
+        unknown = delta('unknown_credits', appeal_id)
+        over_goal = after['raised'][appeal_id] > after['goals'][appeal_id]
+        findings['appeals'].append({
+            'appeal': appeal_id,
+            'raised': raised,
+            'donation_records_sum': records,
+            'client_accepted_sum': accepted,
+            'unknown_sum': unknown,
+            'raised_total': after['raised'][appeal_id],
+            'goal': after['goals'][appeal_id],
+            'over_goal': over_goal,
+            'ambiguous': unknown > 0,
+            'consistent': raised == records and within(records, accepted, unknown) and not over_goal
+        })
+
+    for user in users:
+        debited = before['balances'][user['id']] - after['balances'][user['id']]
+        donated = after['user_records'][user['id']] - before['user_records'][user['id']]
+        debits = delta('user_debits', user['id'])
+        unknown_debits = delta('unknown_debits', user['id'])
+        unknown_donations = delta('unknown_donations', user['id'])
+        findings['wallets'].append({
+            'user': user['email'],
+            'debited': debited,
+            'client_debits': debits,
+            'unknown_sum': unknown_debits,
+            'ambiguous': unknown_debits > 0,
+            'consistent': within(debited, debits, unknown_debits)
+        })
+        findings['contributions'].append({
+            'user': user['email'],
+            'donation_records_sum': donated,
+            'wallet_debited': debited,
+            'unknown_sum': unknown_donations + unknown_debits,
+            'ambiguous': unknown_donations + unknown_debits > 0,
+            'consistent': abs(donated - debited) <= unknown_donations + unknown_debits
+        })
+
+    return findings
+
+
+def count_inconsistent(findings):
+    return sum(1 for rows in findings.values() for row in rows if not row['consistent'])
+
+
+def print_summary(levels, findings):
+    print("\n📊 Throughput, latency and consistency by concurrency")
+    print(f"{'workers':>8} {'ok':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'bad':>5} {'ambig':>6}  errors")
+    for level in levels:
+        print(f"{level['concurrency']:>8} {level['donations_ok']:>6} {level['throughput_rps']:>9} "
+              f"{level['p50_ms']:>9} {level['p95_ms']:>9} {level['p99_ms']:>9} "
+              f"{level['inconsistent']:>5} {level['ambiguous']:>6}  {level['errors'] or '-'}")
+
+    print("\n🔍 Balance consistency audit")
+    for level, level_findings in zip(levels, findings):
+        for section, rows in level_findings.items():
+            bad = [row for row in rows if not row['consistent']]
+            if bad:
+                print(f"❌ {level['concurrency']} workers, {section}: {len(bad)}/{len(rows)} inconsistent")
+                for row in bad[:5]:
+                    print(f"   {row}")
+        if not count_inconsistent(level_findings):
+            print(f"✅ {level['concurrency']} workers: all totals consistent")
+
+
+def write_reports(levels, findings, run_id):
+    Path('reports').mkdir(exist_ok=True)
+    csv_path = Path('reports') / 'stress_donations.csv'
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(levels[0].keys()))
+        writer.writeheader()
+        for level in levels:
+            writer.writerow({**level, 'errors': json.dumps(level['errors'])})
+
+    audit_path = Path('reports') / 'stress_donations_audit.json'
+    with open(audit_path, 'w') as f:
+        json.dump({
+            'run_id': run_id,
+            'levels': [{**level, 'audit': level_findings} for level, level_findings in zip(levels, findings)]
+        }, f, indent=2)
+
+    print(f"📁 Reports written: {csv_path}, {audit_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress ConnectAid donations and audit balances')
+    parser.add_argument('--users', type=int, default=TestConfig.STRESS_USERS,
+                        help=f'Number of seeded donors (default: {TestConfig.STRESS_USERS})')
+    parser.add_argument('--appeals', type=int, default=TestConfig.STRESS_HOT_APPEALS,
+                        help=f'Number of hot appeals (default: {TestConfig.STRESS_HOT_APPEALS})')
+    parser.add_argument('--levels', type=lambda s: [int(x) for x in s.split(',')],
+                        default=TestConfig.STRESS_CONCURRENCY_LEVELS,
+                        help='Comma separated concurrency levels (default: %(default)s)')
+    parser.add_argument('--in-flight-per-user', type=int, default=TestConfig.STRESS_IN_FLIGHT_PER_USER,
+                        help='Concurrent donations sharing one donor wallet '
+                             f'(default: {TestConfig.STRESS_IN_FLIGHT_PER_USER})')
+    parser.add_argument('--donations', type=int, default=TestConfig.STRESS_DONATIONS_PER_LEVEL,
+                        help=f'Donations per level (default: {TestConfig.STRESS_DONATIONS_PER_LEVEL})')
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    print(f"🚀 Donation stress run {run_id} against {API_URL}")
+
+    users = seed_users(args.users, run_id)
+    appeals = seed_appeals(args.appeals, users[0], run_id)
+    ledger = DonationLedger()
+
+    levels = []
+    findings = []
+    for concurrency in args.levels:
+        before = snapshot_server(users, appeals)
+        ledger_before = ledger.snapshot()
+
+        print(f"⏱️  Running {args.donations} donations with {concurrency} workers...")
+        level = run_level(concurrency, args.donations, users, appeals, ledger, args.in_flight_per_user)
+
+        level_findings = audit(users, appeals, before, snapshot_server(users, appeals),
+                               ledger_before, ledger.snapshot())
+        level['inconsistent'] = count_inconsistent(level_findings)
+        level['ambiguous'] = sum(1 for rows in level_findings.values() for row in rows if row['ambiguous'])
+        findings.append(level_findings)
+        levels.append(level)
+
+        # Keep the reports current so completed levels survive a later failure
+        write_reports(levels, findings, run_id)
+
+    print_summary(levels, findings)
+
+    return 0 if all(level['inconsistent'] == 0 for level in levels) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())